@@ -5,13 +5,16 @@ Exposes a /invocations endpoint that delegates all fraud analysis
 to the Strands-powered agent defined in agent_fraud_detection.py.
 """
 
+import asyncio
 import logging
 import os
 import time
 import traceback
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
+import anyio.to_thread
+import orjson
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import ORJSONResponse
 from typing import Dict, Any
 
 # ─────────────────────────────────────────────
@@ -27,31 +30,52 @@ logger = logging.getLogger("fraud-agent.api")
 
 logger.info("Starting Fraud Detection Agent — loading modules...")
 
-# Import the fraud detection agent function from the sibling module
-from agent_fraud_detection import analyze_transaction
+# Import the fraud detection agent functions from the sibling module
+from agent_fraud_detection import analyze_transaction, analyze_transactions_batch
 
 logger.info("Module agent_fraud_detection loaded successfully")
 
-app = FastAPI(title="Fraud Detection Agent", version="1.0.0")
+app = FastAPI(
+    title="Fraud Detection Agent",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
+
+# Worker threads used for blocking agent calls — the anyio default of 40
+# would cap how many Bedrock requests can be in flight at once
+THREAD_POOL_SIZE = int(os.environ.get("THREAD_POOL_SIZE", "200"))
+
+
+@app.on_event("startup")
+async def configure_thread_pool():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREAD_POOL_SIZE
+    logger.info(f"Thread pool limit set to {THREAD_POOL_SIZE}")
 
 
 # ─────────────────────────────────────────────
-# REQUEST / RESPONSE SCHEMAS
+# REQUEST PARSING
+# The payload shapes here are a single dict key wrapping free-form
+# transaction fields — validated by hand so no Pydantic model is
+# instantiated and encoded per request
 # ─────────────────────────────────────────────
 
-class InvocationRequest(BaseModel):
-    input: Dict[str, Any]
-
-class InvocationResponse(BaseModel):
-    output: Dict[str, Any]
+async def _read_json_body(request: Request, request_id: str) -> Dict[str, Any]:
+    try:
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        logger.warning(f"[{request_id}] Request body is not valid JSON")
+        raise HTTPException(status_code=400, detail="Request body must be valid JSON.")
+    if not isinstance(body, dict):
+        raise HTTPException(status_code=400, detail="Request body must be a JSON object.")
+    return body
 
 
 # ─────────────────────────────────────────────
 # ENDPOINTS
 # ─────────────────────────────────────────────
 
-@app.post("/invocations", response_model=InvocationResponse)
-async def invoke_agent(request: InvocationRequest):
+@app.post("/invocations")
+async def invoke_agent(request: Request):
     """
     Receive a transaction payload and return a fraud risk assessment.
 
@@ -67,10 +91,17 @@ async def invoke_agent(request: InvocationRequest):
         output.amount      : float — original transaction amount
     """
     request_id = f"txn-{time.time_ns()}"
-    logger.info(f"[{request_id}] POST /invocations — received request: {request.input}")
+    body = await _read_json_body(request, request_id)
+    logger.info(f"[{request_id}] POST /invocations — received request: {body.get('input')}")
 
     try:
-        input_data: Dict[str, Any] = request.input
+        input_data = body.get("input")
+        if not isinstance(input_data, dict):
+            logger.warning(f"[{request_id}] Missing 'input' object in request")
+            raise HTTPException(
+                status_code=400,
+                detail="Please provide the transaction as an 'input' object."
+            )
 
         # Validate that 'amount' is present — it is the minimum required field
         if "amount" not in input_data or not input_data["amount"]:
@@ -80,14 +111,20 @@ async def invoke_agent(request: InvocationRequest):
                 detail="Amount not provided. Please include 'amount' (in USD) in the request."
             )
 
-        # Delegate full analysis to the Strands fraud detection agent
+        # Delegate full analysis to the Strands fraud detection agent.
+        # The agent call blocks on a Bedrock round-trip, so run it in a
+        # worker thread to keep the event loop free for other requests.
         logger.info(f"[{request_id}] Calling analyze_transaction with: {input_data}")
         start = time.time()
-        result: Dict[str, Any] = analyze_transaction(input_data)
+        result: Dict[str, Any] = await anyio.to_thread.run_sync(
+            analyze_transaction, input_data
+        )
         elapsed = time.time() - start
         logger.info(f"[{request_id}] Agent completed in {elapsed:.2f}s — result: {result}")
 
-        return InvocationResponse(output=result)
+        # Return a Response directly so FastAPI skips the jsonable_encoder
+        # pass and serializes with orjson's C-level encoder
+        return ORJSONResponse({"output": result})
 
     except HTTPException:
         raise
@@ -100,6 +137,74 @@ async def invoke_agent(request: InvocationRequest):
         )
 
 
+# Cap parallel agent calls per process so batches respect Bedrock TPS limits
+BATCH_CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "16"))
+_batch_semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+
+@app.post("/batch_invocations")
+async def invoke_agent_batch(request: Request):
+    """
+    Analyze a list of transactions in one request.
+
+    Transactions run concurrently (bounded by BATCH_CONCURRENCY) instead of
+    one POST per transaction, amortizing per-request overhead. Each entry in
+    `outputs` is either a risk assessment or an `error` object, in the same
+    order as `inputs` — one bad transaction does not fail the batch.
+    """
+    request_id = f"batch-{time.time_ns()}"
+    body = await _read_json_body(request, request_id)
+
+    inputs = body.get("inputs")
+    if not isinstance(inputs, list) or not inputs:
+        raise HTTPException(
+            status_code=400,
+            detail="No transactions provided. Please include a non-empty 'inputs' list."
+        )
+
+    logger.info(f"[{request_id}] POST /batch_invocations — {len(inputs)} transactions")
+
+    start = time.time()
+
+    if os.environ.get("EXPLAIN_WITH_LLM") == "1":
+        # LLM path: fan the agent calls out over worker threads
+        async def analyze_one(tx: Dict[str, Any]) -> Dict[str, Any]:
+            if not isinstance(tx, dict) or "amount" not in tx or not tx["amount"]:
+                return {"error": "Amount not provided. Please include 'amount' (in USD)."}
+            async with _batch_semaphore:
+                return await anyio.to_thread.run_sync(analyze_transaction, tx)
+
+        results = await asyncio.gather(
+            *(analyze_one(tx) for tx in inputs),
+            return_exceptions=True,
+        )
+        outputs = [
+            {"error": f"Agent processing failed: {r}"} if isinstance(r, Exception) else r
+            for r in results
+        ]
+    else:
+        # Rule-based path: score all valid transactions in one vectorized
+        # pass and splice error entries back in input order
+        valid = [
+            (i, tx) for i, tx in enumerate(inputs)
+            if isinstance(tx, dict) and tx.get("amount")
+        ]
+        outputs: list = [
+            {"error": "Amount not provided. Please include 'amount' (in USD)."}
+        ] * len(inputs)
+        if valid:
+            scored = await anyio.to_thread.run_sync(
+                analyze_transactions_batch, [tx for _, tx in valid]
+            )
+            for (i, _), result in zip(valid, scored):
+                outputs[i] = result
+
+    elapsed = time.time() - start
+    logger.info(f"[{request_id}] Batch of {len(outputs)} completed in {elapsed:.2f}s")
+
+    return ORJSONResponse({"outputs": outputs})
+
+
 @app.get("/ping")
 async def ping():
     """Health check endpoint."""
@@ -115,4 +220,13 @@ async def ping():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8080)
\ No newline at end of file
+    # uvloop + httptools come with uvicorn[standard]; workers require the
+    # app as an import string instead of an object
+    uvicorn.run(
+        "agent:app",
+        host="0.0.0.0",
+        port=8080,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.environ.get("WEB_CONCURRENCY", "4")),
+    )
\ No newline at end of file
